@@ -3,7 +3,7 @@ from typing import Tuple, Set, List, Optional
 
 import numpy as np
 
-from utils import get_valid_moves
+from utils import get_valid_moves, build_valid_mask
 
 
 class MCTSNode:
@@ -20,7 +20,8 @@ def is_terminal(state, target: Tuple[int, int], apples: Set[Tuple[int, int]]) ->
     return pos == target and collected == apples
 
 
-def rollout_policy(game_map, state, target: Tuple[int, int], apples: Set[Tuple[int, int]], max_steps=150) -> float:
+def rollout_policy(game_map, state, target: Tuple[int, int], apples: Set[Tuple[int, int]], max_steps=150,
+                   valid_mask=None) -> float:
     # Random rollout policy, simulate until terminal or max steps
     pos, collected = state
     collected = set(collected)
@@ -32,7 +33,7 @@ def rollout_policy(game_map, state, target: Tuple[int, int], apples: Set[Tuple[i
             break
 
         visited.add(pos)
-        moves = get_valid_moves(game_map, pos)
+        moves = get_valid_moves(game_map, pos, valid_mask=valid_mask)
         moves = [m for m in moves if m not in visited]  # avoid loops
 
         if not moves:
@@ -81,11 +82,11 @@ def tree_policy(node, game_map, target: Tuple[int, int], apples: Set[Tuple[int,
     return node
 
 
-def expand(node, game_map, apples, visited_states):
+def expand(node, game_map, apples, visited_states, valid_mask=None):
     pos, collected = node.state
     collected = set(collected)
 
-    for move in get_valid_moves(game_map, pos):
+    for move in get_valid_moves(game_map, pos, valid_mask=valid_mask):
         new_collected = set(collected)
         if move in apples:
             new_collected.add(move)
@@ -130,6 +131,7 @@ def mcts(game_map: np.ndarray, start: Tuple[int, int], target: Tuple[int, int],
     """
     root = MCTSNode((start, frozenset()))
     visited_states = {root.state}
+    valid_mask = build_valid_mask(game_map)
 
     for _ in range(iterations):
         node = root
@@ -138,11 +140,11 @@ def mcts(game_map: np.ndarray, start: Tuple[int, int], target: Tuple[int, int],
             node = tree_policy(node, game_map, target, apples, C)
         # Expansion
         if not is_terminal(node.state, target, apples):
-            expand(node, game_map, apples, visited_states)
+            expand(node, game_map, apples, visited_states, valid_mask=valid_mask)
             if node.children:
                 node = random.choice(node.children)
         # Simulation
-        reward = rollout_policy(game_map, node.state, target, apples)
+        reward = rollout_policy(game_map, node.state, target, apples, valid_mask=valid_mask)
         # Backpropagation
         backpropagate(node, reward)
 
@@ -23,6 +23,7 @@ def bfs(game_map: np.ndarray, start: Tuple[int, int], target: Tuple[int, int]) -
     visited = set()
     queue.append(start)
     visited.add(start)
+    valid_mask = build_valid_mask(game_map)
 
     # Create a dictionary to keep track of the parent node for each node in the path
     parent = {start: None}
@@ -38,7 +39,7 @@ def bfs(game_map: np.ndarray, start: Tuple[int, int], target: Tuple[int, int]) -
             return path
 
         # Visit all adjacent neighbors of the dequeued vertex
-        for neighbor in get_valid_moves(game_map, current):
+        for neighbor in get_valid_moves(game_map, current, valid_mask=valid_mask):
             if neighbor not in visited:
                 queue.append(neighbor)
                 visited.add(neighbor)
@@ -55,6 +56,7 @@ def a_star(game_map: np.ndarray, start: Tuple[int, int], target: Tuple[int, int]
     close_list = []
     # additional dict which maintains the nodes in the open list for an easier access and check
     support_list = {}
+    valid_mask = build_valid_mask(game_map)
 
     starting_state_g = 0
     starting_state_h = h(game_map, start, target, **kwargs) if h == cached_bfs else h(start, target)
@@ -75,7 +77,7 @@ def a_star(game_map: np.ndarray, start: Tuple[int, int], target: Tuple[int, int]
             path = build_path(parent, target)
             return path
 
-        for neighbor in get_valid_moves(game_map, current):
+        for neighbor in get_valid_moves(game_map, current, valid_mask=valid_mask):
             # check if neighbor in close list, if so continue
             if neighbor in close_list:
                 continue
@@ -120,14 +122,12 @@ def heuristic_with_apples_MST(current: Tuple[int, int], apples: Set[Tuple[int, i
         return manhattan_distance(current, target)
 
     all_points = [current] + points + [target]
-    edges = []
 
-    # Build complete graph with manhattan distances
-    for i in range(len(all_points)):
-        for j in range(i + 1, len(all_points)):
-            p1, p2 = all_points[i], all_points[j]
-            dist = manhattan_distance(p1, p2)
-            edges.append((dist, i, j))
+    # Build complete graph with manhattan distances, batched in one NumPy kernel
+    dist_matrix = manhattan_distance_pairwise(all_points)
+    edges = [(int(dist_matrix[i, j]), i, j)
+             for i in range(len(all_points))
+             for j in range(i + 1, len(all_points))]
 
     # Kruskal's algorithm to compute MST
     parent = list(range(len(all_points)))
@@ -170,6 +170,7 @@ def a_star_collect_apples(game_map: np.ndarray, start: Tuple[int, int], target:
     open_list = PriorityQueue()
     close_set = set()
     support_list = {}
+    valid_mask = build_valid_mask(game_map)
 
     collected = frozenset()
     h_val = heuristic_with_apples_MST(start, apples, target)
@@ -201,7 +202,7 @@ def a_star_collect_apples(game_map: np.ndarray, start: Tuple[int, int], target:
 
         is_going_to_apple = new_collected != apples
 
-        for neighbor in get_valid_moves(game_map, current, avoid_stairs=is_going_to_apple):
+        for neighbor in get_valid_moves(game_map, current, avoid_stairs=is_going_to_apple, valid_mask=valid_mask):
             neighbor_g = current_cost + 1
             neighbor_state = (neighbor, new_collected)
             if neighbor_state in support_list and neighbor_g >= support_list[neighbor_state]:
@@ -253,6 +254,8 @@ def a_star_apple(
     # Set of nodes already evaluated
     closed_set = set()
 
+    valid_mask = build_valid_mask(game_map)
+
     def apple_in_vicinity(pos: Tuple[int, int]) -> bool:
         """
         Check if there is at least one apple in the 8 adjacent cells around pos.
@@ -289,7 +292,7 @@ def a_star_apple(
         current_g = g_scores[current]
 
         # Explore neighbors of current node
-        for neighbor in get_valid_moves(game_map, current):
+        for neighbor in get_valid_moves(game_map, current, valid_mask=valid_mask):
             if neighbor in closed_set:
                 continue  # skip neighbors already evaluated
 
@@ -375,6 +378,7 @@ def potential_field_path(game_map: np.ndarray, start: Tuple[int, int], target: T
     steps = 0
     visit_count = defaultdict(int)
     path_cache = {}
+    valid_mask = build_valid_mask(game_map)
 
     while steps < max_steps:
         steps += 1
@@ -388,7 +392,7 @@ def potential_field_path(game_map: np.ndarray, start: Tuple[int, int], target: T
         remaining_apples = apples - collected
         visit_count[pos] += 1
 
-        candidates = get_valid_moves(game_map, pos)
+        candidates = get_valid_moves(game_map, pos, valid_mask=valid_mask)
         if not candidates:
             break  # dead end
 
@@ -457,6 +461,7 @@ def greedy_best_first_search(game_map: np.ndarray, start: Tuple[int, int], targe
     start_state = (start, frozenset())  # position, collected_apples
     frontier = []
     path_cache = {}
+    valid_mask = build_valid_mask(game_map)
     heapq.heappush(frontier,
                    (evaluate_heuristic(game_map, start, frozenset(), apples, target, path_cache), start_state, [start]))
     visited = set()
@@ -471,7 +476,7 @@ def greedy_best_first_search(game_map: np.ndarray, start: Tuple[int, int], targe
         if pos == target and collected == apples:
             return path
 
-        for move in get_valid_moves(game_map, pos):
+        for move in get_valid_moves(game_map, pos, valid_mask=valid_mask):
             new_collected = set(collected)
             if move in apples:
                 new_collected.add(move)
@@ -3,7 +3,7 @@ from typing import List, Tuple
 import numpy as np
 
 from algorithms import a_star
-from utils import get_stairs_location, manhattan_distance, get_valid_moves, bfs_path_length
+from utils import get_stairs_location, manhattan_distance, get_valid_moves, bfs_path_length, build_valid_mask
 
 
 def a_star_online(game_map, start, **kwargs):
@@ -53,16 +53,18 @@ def planner_online(game_map, start, planner_func, verbose=True, **kwargs):
     return planner_func(game_map, start, target, set(apple_positions), **kwargs)
 
 
-def score_frontier(game_map: np.ndarray, start: Tuple[int, int], frontier_cell: Tuple[int, int], info_gain=0) -> float:
+def score_frontier(game_map: np.ndarray, start: Tuple[int, int], frontier_cell: Tuple[int, int], info_gain=0,
+                   valid_mask=None) -> float:
     """
     Score the frontier tiles based on their distance from the start position and number of adjacent unknown tiles.
+    Callers scoring many cells on the same map should pass a precomputed valid_mask.
     """
     path_len = bfs_path_length(game_map, start, frontier_cell)
     if path_len == float('inf') or path_len == 0:
         return -float('inf')  # Skip unreachable or current position
 
     # Count unknown tiles adjacent to the frontier cell
-    for ny, nx in get_valid_moves(game_map, frontier_cell):
+    for ny, nx in get_valid_moves(game_map, frontier_cell, valid_mask=valid_mask):
         if game_map[ny, nx] == ord(' '):  # Unknown tile
             info_gain += 1
 
@@ -100,10 +102,11 @@ def find_target(game_map, start, verbose=True) -> Tuple[List[Tuple[int, int]], T
     if target is None:
         if verbose: print("No stairs found, evaluating frontier.")
         frontier = frontier_search(game_map)
+        valid_mask = build_valid_mask(game_map)
         best_score = -float('inf')
         # Score the frontier tiles to find the one with the best information gain
         for pos in frontier:
-            score = score_frontier(game_map, start, pos)
+            score = score_frontier(game_map, start, pos, valid_mask=valid_mask)
             if score > best_score:
                 best_score = score
                 target = pos
@@ -119,14 +122,15 @@ def find_target(game_map, start, verbose=True) -> Tuple[List[Tuple[int, int]], T
             best_apple = None
             best_apple_score = -float('inf')
             for apple in apple_positions:
-                score = score_frontier(game_map, start, apple, info_gain=1)  # Apples give a fixed info gain of 1
+                # Apples give a fixed info gain of 1
+                score = score_frontier(game_map, start, apple, info_gain=1, valid_mask=valid_mask)
                 if score > best_apple_score:
                     best_apple_score = score
                     best_apple = apple
 
             # Decide whether to target an apple or the frontier, if both are available
             if target is not None:
-                if best_apple_score > score_frontier(game_map, start, target):
+                if best_apple_score > score_frontier(game_map, start, target, valid_mask=valid_mask):
                     target = best_apple
                     if verbose: print("Targeting apple instead of frontier:", target)
             else:
@@ -151,13 +155,14 @@ def frontier_search(game_map: np.ndarray) -> List[Tuple[int, int]]:
     """
     frontier = []
     rows, cols = game_map.shape
+    valid_mask = build_valid_mask(game_map)
 
     for y in range(rows):
         for x in range(cols):
             # Check if the current tile is unknown
             if game_map[y, x] == ord(' '):
                 # Check moore neighborhood for walkable tiles
-                for ny, nx in get_valid_moves(game_map, (y, x)):
+                for ny, nx in get_valid_moves(game_map, (y, x), valid_mask=valid_mask):
                     # Check if the adjacent tile is known
                     if game_map[ny, nx] != ord(' '):
                         frontier.append((y, x))
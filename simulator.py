@@ -45,7 +45,7 @@ def simulate_offline_planning(env, fun: callable, verbose: bool = True, clear_ou
     """
 
     state, _ = env.reset()
-    game_map = state['chars']
+    game_map = utils.as_uint8_map(state['chars'])
     game = state['pixel_crop' if cropped else 'pixel']
     start = utils.get_player_location(game_map)
     target = utils.get_stairs_location(game_map)
@@ -165,7 +165,7 @@ def simulate_online(env, fun: callable, clear_outputs=True, wait_time: float = 0
     - dic: Additional info from the environment.
     """
     state, _ = env.reset()
-    game_map = state['chars']
+    game_map = utils.as_uint8_map(state['chars'])
     game = state['pixel_crop' if cropped else 'pixel']
 
     if verbose:
@@ -239,7 +239,7 @@ def simulate_online(env, fun: callable, clear_outputs=True, wait_time: float = 0
                 break
 
             old_apple_positions = apple_positions
-            game_map = s['chars']
+            game_map = utils.as_uint8_map(s['chars'])
 
     if verbose:
         print(f"Episode finished: {dic}")
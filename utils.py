@@ -1,9 +1,17 @@
+import functools
 import math
+import os
 from collections import deque
 from typing import Tuple, List
 
 import matplotlib.pyplot as plt
 import numpy as np
+from PIL import Image
+
+try:
+    from numba import njit
+except ImportError:  # numba is optional, fall back to the pure Python BFS
+    njit = None
 
 action_map = {
     "N": 0,
@@ -18,17 +26,33 @@ action_map = {
 
 directions = ["UP", "RIGHT", "DOWN", "LEFT", "UP_RIGHT", "DOWN_RIGHT", "DOWN_LEFT", "UP_LEFT"]
 
+# Neighbor offsets in the order get_valid_moves emits them: N, E, S, W, NE, NW, SE, SW
+_BFS_DX = np.array([0, 1, 0, -1, 1, -1, 1, -1], dtype=np.int64)
+_BFS_DY = np.array([-1, 0, 1, 0, -1, -1, 1, 1], dtype=np.int64)
+
+# 256-entry lookup: bitmask of legal directions -> tuple of (dx, dy) offsets, bit k = direction k
+_MASK_MOVES = tuple(
+    tuple((int(_BFS_DX[k]), int(_BFS_DY[k])) for k in range(8) if mask >> k & 1)
+    for mask in range(256)
+)
+
 
 def get_player_location(game_map: np.ndarray, symbol: str = "@") -> Tuple[int, int]:
-    x, y = np.where(game_map == ord(symbol))
-    return int(x[0]), int(y[0])
+    # np.argmax on the boolean view short-circuits at the first match, unlike
+    # np.where which scans the whole map and materializes index arrays
+    flat = game_map.ravel()
+    idx = int(np.argmax(flat == ord(symbol)))
+    if flat[idx] != ord(symbol):
+        raise ValueError(f"Symbol {symbol!r} not found on the map")
+    return divmod(idx, game_map.shape[1])
 
 
 def get_stairs_location(game_map: np.ndarray, symbol: str = ">") -> tuple[int, int] | None:
-    x, y = np.where(game_map == ord(symbol))
-    if x.size == 0 or y.size == 0:
+    flat = game_map.ravel()
+    idx = int(np.argmax(flat == ord(symbol)))
+    if flat[idx] != ord(symbol):
         return None  # No stairs found
-    return int(x[0]), int(y[0])
+    return divmod(idx, game_map.shape[1])
 
 
 def is_floor_tile(lines, x, y):
@@ -37,13 +61,59 @@ def is_floor_tile(lines, x, y):
     return False
 
 
+_WALL_ORDS = np.array([ord('|'), ord('-'), ord('}')], dtype=np.uint8)
+
+# Same wall set as a frozenset of byte values, for scalar membership tests
+_WALL_CHARS = frozenset(_WALL_ORDS.tolist())
+
+
 def is_wall(position_element) -> bool:
-    obstacles = "|-}"
-    return chr(int(position_element)) in obstacles
+    return int(position_element) in _WALL_CHARS
+
+
+def as_uint8_map(game_map: np.ndarray) -> np.ndarray:
+    """
+        Return the map as a C-contiguous uint8 array, copying only when needed.
+
+        The BFS kernels and mask builders all assume this layout; normalizing
+        once at map load keeps every later call on the fast path instead of
+        re-checking (or re-copying) per query.
+    """
+    grid = np.ascontiguousarray(game_map, dtype=np.uint8)
+    assert grid.dtype == np.uint8 and grid.flags['C_CONTIGUOUS']
+    return grid
+
+
+def build_passable_mask(game_map: np.ndarray) -> np.ndarray:
+    """Boolean mask of walkable tiles: True wherever the tile is not a wall ('|', '-', '}')."""
+    return ~np.isin(game_map, _WALL_ORDS)
+
+
+def build_valid_mask(game_map: np.ndarray, passable: np.ndarray = None) -> np.ndarray:
+    """
+        Pack the 8-direction move validity of every cell into one uint8 bitmask.
+
+        Bit k of valid_mask[x, y] is set when moving in direction k (same order as
+        _BFS_DX/_BFS_DY) is legal from (x, y), so the per-cell neighbor expansion
+        becomes a single byte load plus the _MASK_MOVES table lookup instead of
+        eight independent bounds/wall/corner-cut checks.
+
+        :param game_map: The map of the game, with each cell representing a tile.
+        :param passable: Optional precomputed mask from build_passable_mask.
+
+        :return: uint8 array of shape game_map.shape with one validity bit per direction.
+    """
+    if passable is None:
+        passable = build_passable_mask(game_map)
+    valid_mask = np.zeros(passable.shape, dtype=np.uint8)
+    for k, mask in enumerate(_direction_masks(passable)):
+        valid_mask |= mask.astype(np.uint8) << np.uint8(k)
+    return valid_mask
 
 
 def get_valid_moves(game_map: np.ndarray, current_position: Tuple[int, int], avoid_stairs=False,
-                    allow_diagonals=True) -> List[
+                    allow_diagonals=True, passable: np.ndarray = None,
+                    valid_mask: np.ndarray = None) -> List[
     Tuple[int, int]]:
     """
         Returns a list of valid moves from the current position on the game map.
@@ -52,66 +122,32 @@ def get_valid_moves(game_map: np.ndarray, current_position: Tuple[int, int], avo
         :param current_position: The current (x, y) position.
         :param avoid_stairs: If True, treat stairs ('>') as obstacle.
         :param allow_diagonals: If True, include diagonal moves.
+        :param passable: Precomputed mask from build_passable_mask, only used to build
+            the validity bitmask when valid_mask is not given.
+        :param valid_mask: Precomputed bitmask from build_valid_mask; callers that expand
+            many nodes on the same map should build it once and pass it in.
 
         :return: List of valid (x, y) positions that can be moved to.
     """
-    x_limit, y_limit = game_map.shape
-    valid = []
+    if valid_mask is None:
+        valid_mask = build_valid_mask(game_map, passable)
     x, y = current_position
-    # North
-    if y - 1 > 0 and not is_wall(game_map[x, y - 1]):
-        if not (avoid_stairs and game_map[x, y - 1] == ord('>')):
-            valid.append((x, y - 1))
-
-    # East
-    if x + 1 < x_limit and not is_wall(game_map[x + 1, y]):
-        if not (avoid_stairs and game_map[x + 1, y] == ord('>')):
-            valid.append((x + 1, y))
-
-    # South
-    if y + 1 < y_limit and not is_wall(game_map[x, y + 1]):
-        if not (avoid_stairs and game_map[x, y + 1] == ord('>')):
-            valid.append((x, y + 1))
-
-    # West
-    if x - 1 > 0 and not is_wall(game_map[x - 1, y]):
-        if not (avoid_stairs and game_map[x - 1, y] == ord('>')):
-            valid.append((x - 1, y))
-
-    if allow_diagonals:
-        # Needs to check if the diagonal move is valid. If the two adjacent tiles are not walls, then the diagonal move is valid.
-        # North-East
-        if (y - 1 > 0 and x + 1 < x_limit and
-                not is_wall(game_map[x + 1, y - 1]) and
-                not is_wall(game_map[x, y - 1]) and
-                not is_wall(game_map[x + 1, y])):
-            if not (avoid_stairs and game_map[x + 1, y - 1] == ord('>')):
-                valid.append((x + 1, y - 1))
-        # North-West
-        if (y - 1 > 0 and x - 1 > 0 and
-                not is_wall(game_map[x - 1, y - 1]) and
-                not is_wall(game_map[x, y - 1]) and
-                not is_wall(game_map[x - 1, y])):
-            if not (avoid_stairs and game_map[x - 1, y - 1] == ord('>')):
-                valid.append((x - 1, y - 1))
-
-        # South-East
-        if (y + 1 < y_limit and x + 1 < x_limit and
-                not is_wall(game_map[x + 1, y + 1]) and
-                not is_wall(game_map[x, y + 1]) and
-                not is_wall(game_map[x + 1, y])):
-            if not (avoid_stairs and game_map[x + 1, y + 1] == ord('>')):
-                valid.append((x + 1, y + 1))
-
-        # South-West
-        if (y + 1 < y_limit and x - 1 > 0 and
-                not is_wall(game_map[x - 1, y + 1]) and
-                not is_wall(game_map[x, y + 1]) and
-                not is_wall(game_map[x - 1, y])):
-            if not (avoid_stairs and game_map[x - 1, y + 1] == ord('>')):
-                valid.append((x - 1, y + 1))
-
-    return valid
+    mask = int(valid_mask[x, y])
+    if not allow_diagonals:
+        mask &= 0x0F
+    if not avoid_stairs:
+        return [(x + dx, y + dy) for dx, dy in _MASK_MOVES[mask]]
+    stairs = ord('>')
+    return [(x + dx, y + dy) for dx, dy in _MASK_MOVES[mask]
+            if game_map[x + dx, y + dy] != stairs]
+
+
+# Action index for each step direction, indexed by (sign(dy) + 1, sign(dx) + 1)
+_SIGN_ACTIONS = np.array([
+    [action_map["NW"], action_map["N"], action_map["NE"]],
+    [action_map["W"], action_map["S"], action_map["E"]],
+    [action_map["SW"], action_map["S"], action_map["SE"]],
+], dtype=np.int8)
 
 
 def actions_from_path(start: Tuple[int, int], path: List[Tuple[int, int]]) -> List[int]:
@@ -122,34 +158,11 @@ def actions_from_path(start: Tuple[int, int], path: List[Tuple[int, int]]) -> Li
        :param path: A list of positions (tuples) representing the path to follow.
        :return: A list of action indices corresponding to the moves between positions.
        """
-    actions = []
-    y_s, x_s = start
-
-    for (y, x) in path:
-        if x_s == x:
-            if y_s > y:
-                actions.append(action_map["N"])  # Up
-            else:
-                actions.append(action_map["S"])  # Down
-        elif y_s == y:
-            if x_s > x:
-                actions.append(action_map["W"])  # Left
-            else:
-                actions.append(action_map["E"])  # Right
-        else:
-            if y_s > y and x_s > x:
-                actions.append(action_map["NW"])
-            elif y_s > y and x_s < x:
-                actions.append(action_map["NE"])
-            elif y_s < y and x_s > x:
-                actions.append(action_map["SW"])
-            else:
-                actions.append(action_map["SE"])
-
-        y_s = y
-        x_s = x
-
-    return actions
+    if not path:
+        return []
+    points = np.vstack(([start], np.asarray(path, dtype=np.int64)))
+    signs = np.sign(np.diff(points, axis=0))
+    return _SIGN_ACTIONS[signs[:, 0] + 1, signs[:, 1] + 1].tolist()
 
 
 def chebyshev_distance(point1: Tuple[int, int], point2: Tuple[int, int], **kwargs) -> int:
@@ -158,10 +171,18 @@ def chebyshev_distance(point1: Tuple[int, int], point2: Tuple[int, int], **kwarg
     return max(abs(x1 - x2), abs(y1 - y2))
 
 
-def euclidean_distance(point1: Tuple[int, int], point2: Tuple[int, int]) -> float:
+def euclidean_distance_squared(point1: Tuple[int, int], point2: Tuple[int, int], **kwargs) -> int:
+    # Preserves the ordering of euclidean_distance without the sqrt; prefer it
+    # when distances are only compared against each other
     x1, y1 = point1
     x2, y2 = point2
-    return math.sqrt((x1 - x2) ** 2 + (y1 - y2) ** 2)
+    dx = x1 - x2
+    dy = y1 - y2
+    return dx * dx + dy * dy
+
+
+def euclidean_distance(point1: Tuple[int, int], point2: Tuple[int, int]) -> float:
+    return math.sqrt(euclidean_distance_squared(point1, point2))
 
 
 def manhattan_distance(point1: Tuple[int, int], point2: Tuple[int, int], **kwargs) -> int:
@@ -170,33 +191,261 @@ def manhattan_distance(point1: Tuple[int, int], point2: Tuple[int, int], **kwarg
     return abs(x1 - x2) + abs(y1 - y2)
 
 
-def cached_bfs(game_map, start, goal, path_cache):
-    key = (start, goal)
-    if key in path_cache:
-        return path_cache[key]
-    dist = bfs_path_length(game_map, start, goal)
-    path_cache[key] = dist
+def manhattan_distance_batch(points, point: Tuple[int, int]) -> np.ndarray:
+    """Manhattan distance from every row of points to point in one NumPy kernel."""
+    pts = np.asarray(points, dtype=np.int64)
+    return np.abs(pts - np.asarray(point, dtype=np.int64)).sum(axis=1)
+
+
+def chebyshev_distance_batch(points, point: Tuple[int, int]) -> np.ndarray:
+    """Chebyshev distance from every row of points to point in one NumPy kernel."""
+    pts = np.asarray(points, dtype=np.int64)
+    return np.abs(pts - np.asarray(point, dtype=np.int64)).max(axis=1)
+
+
+def euclidean_distance_batch(points, point: Tuple[int, int]) -> np.ndarray:
+    """Euclidean distance from every row of points to point in one NumPy kernel."""
+    pts = np.asarray(points, dtype=np.int64)
+    diff = pts - np.asarray(point, dtype=np.int64)
+    return np.sqrt((diff * diff).sum(axis=1))
+
+
+def manhattan_distance_pairwise(points) -> np.ndarray:
+    """All-pairs Manhattan distance matrix for a list of points, via broadcasting."""
+    pts = np.asarray(points, dtype=np.int64)
+    return np.abs(pts[:, None, :] - pts[None, :, :]).sum(axis=2)
+
+
+# Keeps the maps referenced by _bfs_field_cached alive, keyed by id()
+_map_registry = {}
+
+
+@functools.lru_cache(maxsize=None)
+def _bfs_field_cached(map_id, source):
+    return bfs_distance_map(_map_registry[map_id], source)
+
+
+def cached_bfs(game_map, start, goal, path_cache=None):
+    """
+        BFS distance between start and goal, memoized per endpoint.
+
+        One full-grid BFS from an endpoint answers every later query against it
+        with a single array read, so the cache stores whole distance fields
+        (see bfs_distance_map) instead of one entry per (start, goal) pair.
+        Symmetry is exploited by reusing a field computed from either endpoint;
+        this relies on every kernel treating a wall endpoint as unreachable,
+        the same metric bfs_path_length returns.
+    """
+    if path_cache is None:
+        _map_registry[id(game_map)] = game_map
+        dist = _bfs_field_cached(id(game_map), goal)[start]
+        return int(dist) if dist >= 0 else float('inf')
+    field = path_cache.get(goal)
+    if field is None:
+        field = path_cache.get(start)
+        if field is not None:
+            dist = field[goal]
+            return int(dist) if dist >= 0 else float('inf')
+        field = path_cache.setdefault(goal, bfs_distance_map(game_map, goal))
+    dist = field[start]
+    return int(dist) if dist >= 0 else float('inf')
+
+
+def _direction_masks(passable: np.ndarray) -> List[np.ndarray]:
+    """Per-direction boolean validity arrays (N, E, S, W, NE, NW, SE, SW), built with
+    sliced views so the bounds, wall and diagonal corner-cut rules of get_valid_moves
+    are applied to the whole map at once."""
+    p = passable
+    rows, cols = p.shape
+    masks = [np.zeros((rows, cols), dtype=bool) for _ in range(8)]
+    v_n, v_e, v_s, v_w, v_ne, v_nw, v_se, v_sw = masks
+    v_n[:, 1:] = p[:, :-1]
+    v_e[:-1, :] = p[1:, :]
+    v_s[:, :-1] = p[:, 1:]
+    v_w[1:, :] = p[:-1, :]
+    v_ne[:-1, 1:] = p[1:, :-1] & p[:-1, :-1] & p[1:, 1:]
+    v_nw[1:, 1:] = p[:-1, :-1] & p[1:, :-1] & p[:-1, 1:]
+    v_se[:-1, :-1] = p[1:, 1:] & p[:-1, 1:] & p[1:, :-1]
+    v_sw[1:, :-1] = p[:-1, 1:] & p[1:, 1:] & p[:-1, :-1]
+    return masks
+
+
+def _bfs_numba(game_map, sx, sy, gx, gy):
+    """BFS over the raw uint8 grid; returns the distance from (sx, sy) to (gx, gy), or -1."""
+    rows, cols = game_map.shape
+    c = game_map[sx, sy]
+    if c == 124 or c == 45 or c == 125:  # a wall source reaches nothing
+        return -1
+    visited = np.zeros((rows, cols), np.uint8)
+    dist = np.zeros((rows, cols), np.int32)
+    queue = np.empty(rows * cols * 2, np.int32)
+    head = 0
+    tail = 0
+    queue[tail] = sx * cols + sy
+    tail += 1
+    visited[sx, sy] = 1
+
+    while head < tail:
+        idx = queue[head]
+        head += 1
+        x = idx // cols
+        y = idx % cols
+        d = dist[x, y]
+        for k in range(8):
+            dx = _BFS_DX[k]
+            dy = _BFS_DY[k]
+            nx = x + dx
+            ny = y + dy
+            # Same bounds as get_valid_moves
+            if nx < 0 or nx >= rows or ny < 0 or ny >= cols:
+                continue
+            c = game_map[nx, ny]
+            if c == 124 or c == 45 or c == 125:  # '|', '-', '}' are walls
+                continue
+            if dx != 0 and dy != 0:
+                # Diagonal moves need both adjacent tiles free (corner-cut rule)
+                c1 = game_map[x, ny]
+                c2 = game_map[nx, y]
+                if c1 == 124 or c1 == 45 or c1 == 125 or c2 == 124 or c2 == 45 or c2 == 125:
+                    continue
+            if visited[nx, ny]:
+                continue
+            if nx == gx and ny == gy:
+                return d + 1
+            visited[nx, ny] = 1
+            dist[nx, ny] = d + 1
+            queue[tail] = nx * cols + ny
+            tail += 1
+    return -1
+
+
+if njit is not None:
+    _bfs_numba = njit(boundscheck=False, cache=True)(_bfs_numba)
+
+
+def _bfs_levelset(game_map, source, target=None) -> np.ndarray:
+    """
+        Level-synchronous BFS with whole-array NumPy ops, used when numba is not
+        installed: each wave of the search advances every frontier cell at once
+        by shifting the frontier mask along the 8 direction-validity masks, so
+        the per-node Python loop disappears entirely.
+
+        Returns the int32 distance field (-1 unreachable); stops early once
+        target is reached, leaving later cells at -1.
+    """
+    rows, cols = game_map.shape
+    dist = np.full((rows, cols), -1, np.int32)
+    dist[source] = 0
+    if is_wall(game_map[source]):  # a wall source reaches nothing
+        return dist
+    masks = _direction_masks(build_passable_mask(game_map))
+    frontier = np.zeros((rows, cols), dtype=bool)
+    frontier[source] = True
+    visited = frontier.copy()
+    d = 0
+
+    while frontier.any():
+        if target is not None and frontier[target]:
+            break
+        d += 1
+        nxt = np.zeros((rows, cols), dtype=bool)
+        for k in range(8):
+            movers = frontier & masks[k]
+            dx, dy = int(_BFS_DX[k]), int(_BFS_DY[k])
+            nxt[max(dx, 0):rows + min(dx, 0), max(dy, 0):cols + min(dy, 0)] |= \
+                movers[max(-dx, 0):rows + min(-dx, 0), max(-dy, 0):cols + min(-dy, 0)]
+        nxt &= ~visited
+        dist[nxt] = d
+        visited |= nxt
+        frontier = nxt
     return dist
 
 
+def _bfs_python(game_map, point1, point2) -> int | float:
+    """Pure Python BFS fallback: distance between two points via the level-set BFS."""
+    d = _bfs_levelset(game_map, point1, target=point2)[point2]
+    return int(d) if d >= 0 else float('inf')  # no path
+
+
 def bfs_path_length(game_map, point1, point2) -> int | float:
-    """Return shortest path length between start and goal, accounting for walls."""
+    """Return shortest path length between start and goal, accounting for walls.
+
+    A wall endpoint can be neither entered nor exited, so any pair involving
+    one is unreachable (except the trivial point1 == point2 case); this keeps
+    the metric symmetric and identical to the cached_bfs distance fields.
+    """
     if point1 == point2:
         return 0
+    if njit is None:
+        return _bfs_python(game_map, point1, point2)
+    grid = as_uint8_map(game_map)
+    d = _bfs_numba(grid, int(point1[0]), int(point1[1]), int(point2[0]), int(point2[1]))
+    return int(d) if d >= 0 else float('inf')  # no path
+
+
+def _bfs_field_numba(game_map, sx, sy):
+    """Full-grid BFS from (sx, sy): distance to every cell, -1 where unreachable."""
     rows, cols = game_map.shape
-    visited = set()
-    queue = deque([(point1, 0)])
-    visited.add(point1)
+    dist = np.full((rows, cols), -1, np.int32)
+    dist[sx, sy] = 0
+    c = game_map[sx, sy]
+    if c == 124 or c == 45 or c == 125:  # a wall source reaches nothing
+        return dist
+    queue = np.empty(rows * cols * 2, np.int32)
+    head = 0
+    tail = 0
+    queue[tail] = sx * cols + sy
+    tail += 1
+
+    while head < tail:
+        idx = queue[head]
+        head += 1
+        x = idx // cols
+        y = idx % cols
+        d = dist[x, y]
+        for k in range(8):
+            dx = _BFS_DX[k]
+            dy = _BFS_DY[k]
+            nx = x + dx
+            ny = y + dy
+            if nx < 0 or nx >= rows or ny < 0 or ny >= cols:
+                continue
+            if dist[nx, ny] >= 0:
+                continue
+            c = game_map[nx, ny]
+            if c == 124 or c == 45 or c == 125:  # '|', '-', '}' are walls
+                continue
+            if dx != 0 and dy != 0:
+                c1 = game_map[x, ny]
+                c2 = game_map[nx, y]
+                if c1 == 124 or c1 == 45 or c1 == 125 or c2 == 124 or c2 == 45 or c2 == 125:
+                    continue
+            dist[nx, ny] = d + 1
+            queue[tail] = nx * cols + ny
+            tail += 1
+    return dist
 
-    while queue:
-        (x, y), dist = queue.popleft()
-        for nx, ny in get_valid_moves(game_map, (x, y)):
-            if (nx, ny) == point2:
-                return dist + 1
-            if (nx, ny) not in visited:
-                visited.add((nx, ny))
-                queue.append(((nx, ny), dist + 1))
-    return float('inf')  # no path
+
+if njit is not None:
+    _bfs_field_numba = njit(boundscheck=False, cache=True)(_bfs_field_numba)
+
+
+def _bfs_field_python(game_map, source):
+    return _bfs_levelset(game_map, source)
+
+
+def bfs_distance_map(game_map, source: Tuple[int, int]) -> np.ndarray:
+    """
+        Run one BFS from source over the whole grid and return the distance field.
+
+        dist[x, y] is the shortest path length from source to (x, y), -1 where
+        unreachable, so repeated distance queries against a fixed endpoint become
+        single array reads (see cached_bfs).
+    """
+    if njit is None:
+        return _bfs_field_python(game_map, source)
+    grid = as_uint8_map(game_map)
+    return _bfs_field_numba(grid, int(source[0]), int(source[1]))
 
 
 def randomize_apple_positions(
@@ -217,47 +466,41 @@ def randomize_apple_positions(
 
     """
 
-    import random
-
-    if seed is not None:
-        random.seed(seed)
-
-    apple_positions = []
     lines = [line.rstrip() for line in map_str.strip().split('\n')]
     # print(f"Placing {num_apple} apples between ({min_x}, {min_y}) and ({max_x}, {max_y})")
-    while len(apple_positions) < num_apple:
-        x = random.randint(min_x, max_x)
-        y = random.randint(min_y, max_y)
-        if (x, y) not in apple_positions:
-            if is_floor_tile(lines, x, y) and lines[y][x] != '%':
-                apple_positions.append((x, y))
-            else:
-                continue
+    width = max(len(line) for line in lines)
+    grid = np.array([list(line.ljust(width)) for line in lines])
+
+    # Mask of floor tiles inside the placement rectangle, then sample the apple
+    # positions from it without replacement instead of reject-looping random cells
+    candidates = (grid == '.') & (grid != '%')
+    region = np.zeros_like(candidates)
+    region[min_y:max_y + 1, min_x:max_x + 1] = True
+    ys, xs = np.nonzero(candidates & region)
 
-    return apple_positions
+    if xs.size < num_apple:
+        raise ValueError(f"Only {xs.size} free floor tiles for {num_apple} apples")
+
+    rng = np.random.default_rng(seed)
+    picked = rng.choice(xs.size, size=num_apple, replace=False)
+    return [(int(x), int(y)) for x, y in zip(xs[picked], ys[picked])]
 
 
 def print_path_on_map(game_map: np.ndarray, path: List[Tuple[int, int]]):
-    path_set = set(path)
-    for y in range(game_map.shape[0]):
-        row = ""
-        for x in range(game_map.shape[1]):
-            pos = (y, x)
-            char = chr(int(game_map[y, x]))
-            if pos == path[0]:
-                row += "@"
-            elif pos == path[-1] and char == '>':
-                row += "!"
-            elif pos in path_set:
-                if char == '%':
-                    row += "A"  # collected apple
-                elif char == '>':
-                    row += ">"
-                else:
-                    row += "*"  # part of the path
-            else:
-                row += char
-        print(row)
+    grid = game_map.astype(np.uint8)
+    out = grid.copy()
+    steps = np.asarray(path, dtype=np.int64)
+    on_path = np.zeros(grid.shape, dtype=bool)
+    on_path[steps[:, 0], steps[:, 1]] = True
+    # Mark the whole path with byte masks instead of per-cell branching
+    out[on_path] = ord('*')  # part of the path
+    out[on_path & (grid == ord('%'))] = ord('A')  # collected apple
+    out[on_path & (grid == ord('>'))] = ord('>')
+    if grid[path[-1]] == ord('>'):
+        out[path[-1]] = ord('!')
+    out[path[0]] = ord('@')
+    for row in out:
+        print(row.tobytes().decode('ascii'))
 
 
 def simulate_path(path, game_map, actions):
@@ -265,12 +508,10 @@ def simulate_path(path, game_map, actions):
     """
     print("Simulating path:", path)
     print("Actions to take:", list((map(lambda x: directions[x], actions))))
-    # check how much apple is collected in the path
-    apple_collected = []
-    for (x, y) in path:
-        if chr(game_map[x, y]) == '%' and (x, y) not in apple_collected:
-            apple_collected.append((x, y))
-    apple_collected = len(apple_collected)
+    # check how much apple is collected in the path; a set makes the dedup O(1)
+    # per step instead of a list scan
+    apple = ord('%')
+    apple_collected = len({(x, y) for (x, y) in path if game_map[x, y] == apple})
     print("Apple collected in the path:", apple_collected)
     print("Expected Reward: ", 1 + apple_collected * 0.75 - 0.1 * len(path))
     print_path_on_map(game_map, path)
@@ -278,20 +519,21 @@ def simulate_path(path, game_map, actions):
 
 def save_images_as_video(images, save_dir: str, file_name: str, fps):
     # Create directory if it doesn't exist
-    import os
     if not os.path.exists(save_dir):
         print(f"Creating directory: {save_dir}")
         os.makedirs(save_dir)
 
-    from matplotlib import animation
-
-    fig = plt.figure(figsize=(10, 10))
-    frames = [[plt.imshow(img, animated=True)] for img in images]
-    ani = animation.ArtistAnimation(fig, frames, interval=1000 / fps, blit=True)
+    if not images:
+        print("No frames to save.")
+        return
 
     filename = file_name + '.gif'
     print(f"Saving video to {os.path.join(save_dir, filename)}")
-    ani.save(os.path.join(save_dir, filename), writer='ffmpeg', fps=fps)
+    # Encode the frames directly instead of rendering each one through a
+    # matplotlib figure and the animation writer
+    frames = [Image.fromarray(np.asarray(img)) for img in images]
+    frames[0].save(os.path.join(save_dir, filename), save_all=True,
+                   append_images=frames[1:], duration=1000 / fps, loop=0)
 
 
 def plot_3d_surfaces(
@@ -321,19 +563,14 @@ def plot_3d_surfaces(
     - z2_title: Title for the second plot
     - figsize: Size of the figure
     """
-    x_vals = sorted(agg_df[x_col].unique())
-    y_vals = sorted(agg_df[y_col].unique())
-
-    X, Y = np.meshgrid(x_vals, y_vals)
-    Z1 = np.full_like(X, np.nan, dtype=float)
-    Z2 = np.full_like(X, np.nan, dtype=float)
-
-    for i, y_val in enumerate(y_vals):
-        for j, x_val in enumerate(x_vals):
-            row = agg_df[(agg_df[x_col] == x_val) & (agg_df[y_col] == y_val)]
-            if not row.empty:
-                Z1[i, j] = row[z1_col].values[0]
-                Z2[i, j] = row[z2_col].values[0]
+    # One pivot per metric instead of re-filtering the DataFrame for every (x, y)
+    # combination; missing combinations stay NaN and the axes come out sorted
+    z1_grid = agg_df.pivot_table(index=y_col, columns=x_col, values=z1_col, aggfunc='first')
+    z2_grid = agg_df.pivot_table(index=y_col, columns=x_col, values=z2_col, aggfunc='first')
+
+    X, Y = np.meshgrid(z1_grid.columns.to_numpy(), z1_grid.index.to_numpy())
+    Z1 = z1_grid.to_numpy(dtype=float)
+    Z2 = z2_grid.to_numpy(dtype=float)
 
     fig = plt.figure(figsize=figsize)
 